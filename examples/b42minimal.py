@@ -33,8 +33,8 @@ The serial endpoint can be an Arduino compatible board, programmed with the
 B42 minimal example firmware from https://github.com/amdx/b42lib.
 """
 
-from queue import Queue
-from time import sleep
+from collections import deque
+from threading import Event
 
 from pyb42 import B42Handler
 
@@ -48,28 +48,53 @@ MYERROR_NO_ERROR = 0x00
 MYERROR_INVALID_LENGTH = 0x10
 
 
+class FrameBuffer:
+    """Single-producer/single-consumer frame buffer without locking.
+
+    deque.append()/popleft() are atomic under the GIL, so with one producer
+    (the B42Handler receiver thread) and one consumer (the application main
+    loop) no lock is needed - only an Event to park the idle consumer.
+    """
+
+    def __init__(self):
+        self.frames = deque()
+        self.rx_event = Event()
+
+    def put(self, frame):  # called from the B42Handler receiver thread
+        self.frames.append(frame)
+        self.rx_event.set()
+
+    def get(self):  # called from the application main loop, blocks until a frame arrives
+        self.rx_event.wait()
+        frame = self.frames.popleft()
+        if not self.frames:
+            self.rx_event.clear()
+            if self.frames:  # put() raced with the clear
+                self.rx_event.set()
+        return frame
+
+
 class B42App:
     def __init__(self, port):
-        self.rx_frame_q = Queue()
+        self.rx_frame_q = FrameBuffer()
         self.b42handler = B42Handler(rx_frame_q=self.rx_frame_q, port=port)
         self.b42handler.reset()  # manual reset necessary for some boards
 
+        self.command_handlers = {
+            MYCOMMAND_HELLO: self.on_hello,
+            MYCOMMAND_STATUS: self.on_status,
+            MYCOMMAND_FOO: self.on_foo,
+            MYCOMMAND_BAR: self.on_bar,
+        }
+
         self.is_done = False
 
     def main_loop(self):
         def process_rx_frame():
-            while self.rx_frame_q.empty():
-                sleep(0.1)
-
             rx_frame = self.rx_frame_q.get()
-            if rx_frame.command == MYCOMMAND_HELLO:
-                self.on_hello(rx_frame)
-            elif rx_frame.command == MYCOMMAND_STATUS:
-                self.on_status(rx_frame)
-            elif rx_frame.command == MYCOMMAND_FOO:
-                self.on_foo(rx_frame)
-            elif rx_frame.command == MYCOMMAND_BAR:
-                self.on_bar(rx_frame)
+            handler = self.command_handlers.get(rx_frame.command)
+            if handler:
+                handler(rx_frame)
             else:
                 print('Received unknown command:', rx_frame)
 
@@ -27,3 +27,4 @@
 from . b42handler import B42Handler
 from . commandhandler import CommandHandler
 from . errorhandler import ErrorHandler
+from . framering import B42FrameRing
@@ -24,13 +24,18 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import selectors
+import struct
+import sys
 import threading
 import time
-from collections import namedtuple
+from dataclasses import dataclass
+from typing import Optional
 import serial
 
 import logging
 logger = logging.getLogger(__name__)
+_log_enabled = logger.isEnabledFor
 
 # protocol errors
 B42_ERROR_ZERO_BYTE = 0x01  # invalid 0x00 byte received
@@ -39,8 +44,69 @@ B42_ERROR_EXPECT_DATA1 = 0x03  # data byte 1 expected (seq==1)
 B42_ERROR_EXPECT_DATA2 = 0x04  # data byte 2 expected (seq==2)
 B42_ERROR_EXPECT_DATA3 = 0x05  # data byte 3 expected (seq==3)
 
-B42Frame = namedtuple('B42Frame', 'timestamp command data')
-B42Error = namedtuple('B42Error', 'timestamp code message')
+@dataclass(slots=True, frozen=True)
+class B42Frame:
+    """A received B42 frame."""
+    timestamp: float
+    command: int
+    data: Optional[tuple]
+
+
+@dataclass(slots=True, frozen=True)
+class B42Error:
+    """A B42 protocol error."""
+    timestamp: float
+    code: int
+    message: str
+
+# precomputed TX byte tables
+_CMD_HEADER = tuple(cmd | (num << 4) for num in range(4) for cmd in range(16))  # [num*16+cmd]
+_DATA_TAG = (0x00, 0x40, 0x80, 0xC0)  # data byte sequence bits, indexed by data byte number
+_PACKERS = (struct.Struct('>B'), struct.Struct('>BB'),
+            struct.Struct('>BBB'), struct.Struct('>BBBB'))  # frame packers, indexed by num_data
+
+
+# RX byte classification tables applied per chunk via bytes.translate(): the
+# sequence bits per byte - with 0xFF as sentinel for the invalid 0x00 byte
+# (valid sequence bits are 0x00/0x40/0x80/0xC0) - and the pre-masked data payload
+_SEQ_INVALID = 0xFF
+_SEQ_TABLE = bytes((_SEQ_INVALID,)) + bytes(b & 0xC0 for b in range(1, 256))
+_DATA_TABLE = bytes(b & 0x3F for b in range(256))
+
+
+# specialized value encoders/decoders, dispatched by data length
+
+
+def _encode1(value):
+    return (value & 0x3F,)
+
+
+def _encode2(value):
+    return ((value >> 6) & 0x3F, value & 0x3F)
+
+
+def _encode3(value):
+    return ((value >> 12) & 0x3F, (value >> 6) & 0x3F, value & 0x3F)
+
+
+def _decode1(b42_bytes):
+    return b42_bytes[0]
+
+
+def _decode2(b42_bytes):
+    return (b42_bytes[0] << 6) | b42_bytes[1]
+
+
+def _decode3(b42_bytes):
+    return (b42_bytes[0] << 12) | (b42_bytes[1] << 6) | b42_bytes[2]
+
+
+_ENCODERS = (None, _encode1, _encode2, _encode3)
+_DECODERS = (None, _decode1, _decode2, _decode3)
+
+
+def _noop(*_):
+    pass
 
 
 class B42Handler(threading.Thread):
@@ -67,6 +133,11 @@ class B42Handler(threading.Thread):
     _SHIFT_SEQNUM = 6  # bits 7:6
     _SHIFT_NUMBYTES = 4  # command byte bits 5:4
 
+    # receiver state machine tables, indexed by sequence number (state >> _SHIFT_SEQNUM)
+    _NEXT_STATE = (_STATE_DATA1, _STATE_DATA2, _STATE_DATA3, _STATE_CMD0)
+    _EXPECT_ERR = (B42_ERROR_EXPECT_COMMAND, B42_ERROR_EXPECT_DATA1,
+                   B42_ERROR_EXPECT_DATA2, B42_ERROR_EXPECT_DATA3)
+
     @staticmethod
     def encode_value(value, length):
         """Convert a single int value into a sequence of 1 to 3 B42 data bytes.
@@ -79,16 +150,7 @@ class B42Handler(threading.Thread):
 
         if length not in (1, 2, 3):
             raise ValueError('invalid data length <%s>' % str(length))
-
-        b42_bytes = [0] * length
-        b42_bytes[-1] = value & 0x3F
-        if 1 < length:
-            value >>= 6
-            b42_bytes[-2] = value & 0x3F
-            if 2 < length:
-                value >>= 6
-                b42_bytes[-3] = value & 0x3F
-        return tuple(b42_bytes)
+        return _ENCODERS[length](value)
 
     @staticmethod
     def decode_value(*b42_bytes):
@@ -102,17 +164,10 @@ class B42Handler(threading.Thread):
         length = len(b42_bytes)
         if length not in (1, 2, 3):
             raise ValueError('invalid number of data bytes <%d>' % length)
+        return _DECODERS[length](b42_bytes)
 
-        value = b42_bytes[0]
-        if 1 < length:
-            value <<= 6
-            value |= b42_bytes[1]
-            if 2 < length:
-                value <<= 6
-                value |= b42_bytes[2]
-        return value
-
-    def __init__(self, rx_frame_q=None, rx_error_q=None, port=DEFAULT_PORT, baudrate=DEFAULT_BAUD, start=True):
+    def __init__(self, rx_frame_q=None, rx_error_q=None, port=DEFAULT_PORT, baudrate=DEFAULT_BAUD, start=True,
+                 rx_frame_cb=None):
         """Initialize the connection to the board.
 
         Establish the low level serial or socket connection to the remote board and
@@ -129,16 +184,37 @@ class B42Handler(threading.Thread):
         :param baudrate: serial baud rate
         :param start: if `True`, the receiver thread is started automatically, else
             :method:`start()` has to be called manually to begin receiving B42 frames
+        :param rx_frame_cb: (optional) callable invoked with (`timestamp`, `command`,
+            `data`) for each received frame, bypassing `rx_frame_q` entirely; it runs
+            in the receiver thread context and must not block
         :raises: :class:`serial.SerialException` if serial connection fails
         """
 
         super().__init__(daemon=True)
-        self._rx_frame_q = rx_frame_q
-        self._rx_error_q = rx_error_q
+        # resolve the queue put targets once, the receive path calls them directly
+        self._put_frame = rx_frame_q.put if rx_frame_q else _noop
+        self._put_error = rx_error_q.put if rx_error_q else _noop
+        if rx_frame_cb is not None:
+            # direct-callback mode: no B42Frame allocation, no queue round trip
+            self._process_frame = rx_frame_cb
+            self._process_frame_nodata = lambda timestamp, command: rx_frame_cb(timestamp, command, None)
 
         port = B42Handler._check_socket_port(port)
         self._serial = serial.serial_for_url(port, baudrate=baudrate, timeout=0.5)
 
+        # let the kernel schedule receiver wake-ups on actual data arrival
+        # where possible (POSIX serial/socket fds), else fall back to reads
+        # with timeout
+        self._selector = None
+        if sys.platform != 'win32':
+            try:
+                fileno = self._serial.fileno()
+            except (AttributeError, OSError):
+                fileno = None  # no selectable fd
+            if fileno is not None:
+                self._selector = selectors.DefaultSelector()
+                self._selector.register(fileno, selectors.EVENT_READ)
+
         self._running = False
         if start:
             self.start()
@@ -163,6 +239,8 @@ class B42Handler(threading.Thread):
 
         self._running = False
         self.join()
+        if self._selector is not None:
+            self._selector.close()
         self._serial.close()
 
     def reset(self, hard=True):
@@ -197,26 +275,19 @@ class B42Handler(threading.Thread):
         :raises: :class:`ValueError` for invalid `command` and `data` bytes
         """
 
-        def send_byte(byte):
-            return self._serial.write(bytes((byte,)))
-
 #        print('TX:', hex(command), str(data))
+        num_data = len(data)
         if command < 0x01 or 0x0F < command:
             raise ValueError('command <0x%02X> out of range [0x01..0x0F]' % command)
-        if len(data):
-            if 3 < len(data):
+        if num_data:
+            if 3 < num_data:
                 raise ValueError('more than 3 data bytes: <%s>' % str(data))
             for i, d in enumerate(data):
                 if d < 0x00 or 0x3F < d:
                     raise ValueError('data%d <0x%02X> out of range [0x00..0x3F]' % (i + 1, d))
-        length = send_byte(command | (len(data) << B42Handler._SHIFT_NUMBYTES))
-        if len(data):
-            length += send_byte(data[0] | B42Handler._STATE_DATA1)
-            if 1 < len(data):
-                length += send_byte(data[1] | B42Handler._STATE_DATA2)
-                if 2 < len(data):
-                    length += send_byte(data[2] | B42Handler._STATE_DATA3)
-        return length
+        frame = _PACKERS[num_data].pack(_CMD_HEADER[num_data * 16 + command],
+                                        *(d | _DATA_TAG[i + 1] for i, d in enumerate(data)))
+        return self._serial.write(frame)
 
     @staticmethod
     def _check_socket_port(port):
@@ -230,73 +301,108 @@ class B42Handler(threading.Thread):
 
     def run(self):
         """Internal. The receiver thread loop."""
-        state = B42Handler._STATE_CMD0
+        # bind hot names to locals - saves two dict lookups per use in the loop below
+        STATE_CMD0 = B42Handler._STATE_CMD0
+        SEQ_INVALID = _SEQ_INVALID
+        SEQ_TABLE = _SEQ_TABLE
+        DATA_TABLE = _DATA_TABLE
+        MASK_CMD = B42Handler._MASK_CMD
+        SHIFT_SEQNUM = B42Handler._SHIFT_SEQNUM
+        SHIFT_NUMBYTES = B42Handler._SHIFT_NUMBYTES
+        NEXT_STATE = B42Handler._NEXT_STATE
+        EXPECT_ERR = B42Handler._EXPECT_ERR
+        serial = self._serial
+        serial_read = serial.read
+        selector = self._selector
+        process_frame = self._process_frame
+        process_frame_nodata = self._process_frame_nodata
+        process_error = self._process_error
+        time_time = time.time
+
+        state = STATE_CMD0
         timestamp = None
         command = None
         num_bytes = None
-        data = [None] * 3
+        data = bytearray(3)  # preallocated, reused for every frame
 
         self._running = True
         while self._running:
-            # receive next byte
-            rx_bytes = self._serial.read()
-            if rx_bytes == b'':  # timeout
-                continue
-            rx_byte = rx_bytes[0]
-#            print('rx:', hex(rx_byte))
-
-            # check for valid byte
-            if rx_byte == 0x00:  # ERROR: invalid 0x00 byte received
-                self._process_error(B42_ERROR_ZERO_BYTE, '0x00 byte received')
-                state = B42Handler._STATE_CMD0
-                continue  # wait for next valid command byte
-            seq_bits = rx_byte & B42Handler._MASK_SEQ  # rx sequence bits
-            if seq_bits != state:  # ERROR: invalid rx sequence number
-                if state == B42Handler._STATE_CMD0:
-                    self._process_error(
-                        B42_ERROR_EXPECT_COMMAND,
-                        'expected command byte, received <0x%02X>' % rx_byte
-                    )
+            # receive next chunk - the timeouts only serve to recheck self._running
+            if selector is not None:
+                # park in select() until the kernel signals data arrival
+                if not selector.select(timeout=0.5):
+                    continue
+                chunk = serial_read(serial.in_waiting or 1)
+            else:
+                # no selectable fd - block for the first byte, then drain the OS buffer
+                chunk = serial_read(1)
+                if not chunk:  # timeout
+                    continue
+                in_waiting = serial.in_waiting
+                if in_waiting:
+                    chunk += serial_read(in_waiting)
+            # all bytes of the chunk arrived within the read window, one
+            # timestamp per chunk is as accurate as serial frame timing
+            batch_ts = time_time()
+            # pre-mask the whole chunk in C: sequence bits and data payload per byte
+            seqs = chunk.translate(SEQ_TABLE)
+            payload = chunk.translate(DATA_TABLE)
+
+            for rx_byte, seq_bits, rx_data in zip(chunk, seqs, payload):
+#                print('rx:', hex(rx_byte))
+
+                # check for valid byte
+                if seq_bits == SEQ_INVALID:  # ERROR: invalid 0x00 byte received
+                    process_error(B42_ERROR_ZERO_BYTE, '0x00 byte received')
+                    state = STATE_CMD0
                     continue  # wait for next valid command byte
-                else:
-                    exp_num = state >> B42Handler._SHIFT_SEQNUM
-                    self._process_error(
-                        B42_ERROR_EXPECT_DATA1 + exp_num - 1,
-                        'expected data byte %d, received <0x%02X>' % (exp_num, rx_byte)
-                    )
-                    state = B42Handler._STATE_CMD0
-                    if seq_bits != B42Handler._STATE_CMD0:  # not a command byte
+                if seq_bits != state:  # ERROR: invalid rx sequence number
+                    if state == STATE_CMD0:
+                        process_error(
+                            B42_ERROR_EXPECT_COMMAND,
+                            'expected command byte, received <0x%02X>' % rx_byte
+                        )
                         continue  # wait for next valid command byte
-                    # else: process this command byte
-
-            # process received byte
-            if state == B42Handler._STATE_CMD0:
-                timestamp = time.time()
-                command = rx_byte & B42Handler._MASK_CMD
-                num_bytes = rx_byte >> B42Handler._SHIFT_NUMBYTES
-                if num_bytes == 0:  # no data bytes, process frame
-                    self._process_frame(timestamp, command, None)
-                else:  # receive data byte 1
-                    state = B42Handler._STATE_DATA1
-            else:  # state == _STATE_DATAx
-                assert num_bytes
-                seq_num = state >> B42Handler._SHIFT_SEQNUM
-                data[seq_num - 1] = rx_byte & B42Handler._MASK_DATA
-                if seq_num == num_bytes:  # no more data bytes, process frame
-                    self._process_frame(timestamp, command, data[:num_bytes])
-                    state = B42Handler._STATE_CMD0  # receive next frame
-                else:  # receive next data byte
-                    state += B42Handler._STATE_DATA1  # next _STATE_DATAx
-                    assert state <= B42Handler._STATE_DATA3
+                    else:
+                        exp_num = state >> SHIFT_SEQNUM
+                        process_error(
+                            EXPECT_ERR[exp_num],
+                            'expected data byte %d, received <0x%02X>' % (exp_num, rx_byte)
+                        )
+                        state = STATE_CMD0
+                        if seq_bits != STATE_CMD0:  # not a command byte
+                            continue  # wait for next valid command byte
+                        # else: process this command byte
+
+                # process received byte
+                if state == STATE_CMD0:
+                    timestamp = batch_ts
+                    command = rx_byte & MASK_CMD
+                    num_bytes = rx_byte >> SHIFT_NUMBYTES
+                    if num_bytes == 0:  # no data bytes, process frame
+                        process_frame_nodata(timestamp, command)
+                    else:  # receive data byte 1
+                        state = NEXT_STATE[0]
+                else:  # state == _STATE_DATAx
+                    seq_num = state >> SHIFT_SEQNUM
+                    data[seq_num - 1] = rx_data
+                    if seq_num == num_bytes:  # no more data bytes, process frame
+                        process_frame(timestamp, command, tuple(data[:num_bytes]))
+                        state = STATE_CMD0  # receive next frame
+                    else:  # receive next data byte
+                        state = NEXT_STATE[seq_num]  # next _STATE_DATAx
 
     def _process_frame(self, timestamp, command, data):
 #        print('RX:', hex(command), str(data))
-        if self._rx_frame_q:
-            self._rx_frame_q.put(B42Frame(timestamp, command, tuple(data) if data else None))
+        self._put_frame(B42Frame(timestamp, command, data))
+
+    def _process_frame_nodata(self, timestamp, command):
+#        print('RX:', hex(command))
+        self._put_frame(B42Frame(timestamp, command, None))
 
     def _process_error(self, code, msg):
 #        print('ERR:', code, msg)
         now = time.time()
-        if self._rx_error_q:
-            self._rx_error_q.put(B42Error(now, code, msg))
-        logger.error('B42 [%.3f][0x%02X] %s', now, code, msg)
+        self._put_error(B42Error(now, code, msg))
+        if _log_enabled(logging.ERROR):
+            logger.error('B42 [%.3f][0x%02X] %s', now, code, msg)
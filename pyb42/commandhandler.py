@@ -24,29 +24,45 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-from queue import Queue
-from collections import namedtuple
+from collections import deque
+from dataclasses import dataclass
 
 from pyb42.b42handler import B42Frame
 
 import logging
 logger = logging.getLogger(__name__)
+_log_enabled = logger.isEnabledFor
 
 CMD_ERROR_UNREGISTERED = 0x0F  # unregistered command received
 CMD_ERROR_NUM_DATA = 0x0E  # invalid number of data bytes received
 
-CommandError = namedtuple('CommandError', 'timestamp code message')
+@dataclass(slots=True, frozen=True)
+class CommandError:
+    """A B42 command dispatch error."""
+    timestamp: float
+    code: int
+    message: str
 
+# preformatted hex representations of the 16 possible command codes
+_CMD_HEX = tuple('<0x%02X>' % code for code in range(16))
 
-class CommandHandler(Queue):
+# B42 frames carry at most 3 data bytes
+_VALID_NUM_DATA = frozenset((0, 1, 2, 3))
+
+
+class CommandHandler:
     """Handler/dispatcher for B42 commands (frames) received via :class:`B42Handler`.
 
     Intended for use as `rx_frame_q` argument of the :class:`B42Handler` constructor.
     Callbacks registered by :method:`register_command()` are dispatched for matching
     command codes. Dispatching can be triggered synchronously or asynchronously.
+
+    Frames are buffered in a :class:`deque`, whose append/popleft are atomic under
+    the GIL - with the single producer (the :class:`B42Handler` receiver thread)
+    and single consumer (the :method:`dispatch_commands()` caller) no lock is needed.
     """
 
-    def __init__(self, rx_error_q=None, async_dispatch=False, **kwargs):
+    def __init__(self, rx_error_q=None, async_dispatch=False):
         """Initialize the command handler.
 
         :param rx_error_q: (optional) queue/handler to collect/dispatch B42 command
@@ -55,13 +71,19 @@ class CommandHandler(Queue):
         :param async_dispatch: if `True`, dispatch commands as soon as they arrive (in the
             :class:`B42Handler` receiver thread's context), else collect and synchronously
             dispatch them on a call to :method:`dispatch_commands()`
-        :param kwargs: passed to the :class:`Queue` parent constructor
         """
 
-        super().__init__(**kwargs)
+        self._q = deque()
         self._rx_error_q = rx_error_q
+        # resolve the error sink's put() once instead of per error
+        self._err_put = rx_error_q.put if rx_error_q is not None else None
         self._async_dispatch = bool(async_dispatch)
-        self._command_table = {}
+        # command codes are 4 bit, a fixed table indexed by code beats dict hashing
+        self._command_table = [None] * 16
+        # put() is the internal frame entry point used by B42Handler, its
+        # implementation is resolved once here: straight to the dispatcher in
+        # async mode, straight to the C-level deque append in sync mode
+        self.put = self._dispatch_command if self._async_dispatch else self._q.append
 
     def register_command(self, code, callback, num_data=None):
         """Register a command callback for a command code.
@@ -69,32 +91,80 @@ class CommandHandler(Queue):
         Callbacks are invoked with the `timestamp` and `data` fields of the
         received :class:`B42Frame`.
 
-        :param code: B42 command code to register a callback for; if a callback
-            for this `code` is already registered, it is replaced by the new one
+        :param code: B42 command code to register a callback for (range [0x00..0x0F]);
+            if a callback for this `code` is already registered, it is replaced by
+            the new one
         :param callback: callable to dispatch for `code`
         :param num_data: (optional) number of expected data bytes for the B42 command;
             if provided, the number of received command data bytes is checked before
             dispatching the command; can be :class:`int`, :class:`tuple` or :class:`list`
         :raises: :class:`TypeError` for invalid `code`, `callback` and `num_data` types
+        :raises: :class:`ValueError` for an out of range `code`
         """
 
         if type(code) is not int:
             raise TypeError('code <%s> is not an integer' % str(code))
+        if code < 0x00 or 0x0F < code:
+            raise ValueError('code <0x%02X> out of range [0x00..0x0F]' % code)
         if not callable(callback):
             raise TypeError('callback is not a callable')
         if num_data is not None:
             if type(num_data) is int:
                 num_data = (num_data,)
-            elif type(num_data) in (tuple, list):
-                for n in num_data:
-                    if type(n) is not int:
-                        raise TypeError('num_data contains non-integer value <%s>' % str(n))
-            else:
+            elif type(num_data) not in (tuple, list):
                 raise TypeError('num_data is not an integer or a tuple/list')
-
-        if code in self._command_table:
-            logger.warning('replacing registered command: <0x%02X>' % code)
-        self._command_table[code] = (callback, num_data)
+            # bool/float elements would pass the subset check by equality but
+            # break the dispatch specialization, reject them here
+            for n in num_data:
+                if type(n) is not int:
+                    raise TypeError('num_data contains non-integer value <%s>' % str(n))
+            num_data = frozenset(num_data)  # O(1) membership on dispatch
+            if not num_data <= _VALID_NUM_DATA:
+                raise TypeError(
+                    'num_data contains invalid value(s): %s'
+                    % str(sorted(num_data - _VALID_NUM_DATA))
+                )
+            if len(num_data) == 1:
+                num_data, = num_data  # specialize the single-length case
+
+        if self._command_table[code] is not None:
+            logger.warning('replacing registered command: %s', _CMD_HEX[code])
+        self._command_table[code] = self._make_dispatch_entry(code, callback, num_data)
+
+    def _make_dispatch_entry(self, code, callback, num_data):
+        # build a dispatch closure specialized for this registration, so the
+        # per-frame path carries no num_data type tests or table unpacking
+        if num_data is None:
+            def entry(frame):
+                callback(frame.timestamp, frame.data)
+            return entry
+        process_error = self._process_error
+        cmd_hex = _CMD_HEX[code]
+        if type(num_data) is int:  # the common single-length registration
+            def entry(frame):
+                data = frame.data
+                len_data = 0 if data is None else len(data)
+                if len_data == num_data:
+                    callback(frame.timestamp, data)
+                else:
+                    process_error(
+                        frame.timestamp, CMD_ERROR_NUM_DATA,
+                        'invalid number of data bytes for command %s: %d',
+                        cmd_hex, len_data
+                    )
+        else:  # frozenset of allowed lengths
+            def entry(frame):
+                data = frame.data
+                len_data = 0 if data is None else len(data)
+                if len_data in num_data:
+                    callback(frame.timestamp, data)
+                else:
+                    process_error(
+                        frame.timestamp, CMD_ERROR_NUM_DATA,
+                        'invalid number of data bytes for command %s: %d',
+                        cmd_hex, len_data
+                    )
+        return entry
 
     def dispatch_commands(self):
         """Synchronously dispatch all received commands.
@@ -104,39 +174,27 @@ class CommandHandler(Queue):
         Has no effect when initialized for asynchronous dispatching.
         """
 
-        while not self.empty():
-            self._dispatch_command(self.get())
+        q = self._q
+        q_popleft = q.popleft
+        dispatch_command = self._dispatch_command
+        while q:
+            dispatch_command(q_popleft())
 
     def _dispatch_command(self, frame):
-        assert frame.data is None or type(frame.data) is tuple
-        command_info = self._command_table.get(frame.command, None)
-        if command_info:
-            callback, num_data = command_info
-            if num_data is not None:  # check allowed number of data bytes
-                len_data = len(frame.data) if frame.data else 0
-                if len_data not in num_data:
-                    self._process_error(
-                        frame.timestamp, CMD_ERROR_NUM_DATA,
-                        'invalid number of data bytes for command <0x%02X>: %d'
-                        % (frame.command, len_data)
-                    )
-                    return
-            callback(frame.timestamp, frame.data)
+        entry = self._command_table[frame.command]
+        if entry is not None:
+            entry(frame)
         else:
             self._process_error(
                 frame.timestamp, CMD_ERROR_UNREGISTERED,
-                'unregistered command received: <0x%02X>' % frame.command
+                'unregistered command received: %s', _CMD_HEX[frame.command]
             )
 
-    def put(self, item, *_, **__):
-        """Internal. Used by :class:`B42Handler`."""
-        assert type(item) is B42Frame
-        if self._async_dispatch:
-            self._dispatch_command(item)
-        else:
-            super().put(item)
-
-    def _process_error(self, timestamp, code, msg):
-        if self._rx_error_q:
-            self._rx_error_q.put(CommandError(timestamp, code, msg))
-        logger.error('CMD [%.3f][0x%02X] %s', timestamp, code, msg)
+    def _process_error(self, timestamp, code, fmt, *args):
+        # the message is only formatted if an error sink takes it; the logger
+        # defers formatting until a handler accepts the record anyway
+        err_put = self._err_put
+        if err_put is not None:
+            err_put(CommandError(timestamp, code, fmt % args))
+        if _log_enabled(logging.ERROR):
+            logger.error('CMD [%.3f][0x%02X] ' + fmt, timestamp, code, *args)
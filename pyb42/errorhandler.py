@@ -24,19 +24,23 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-from queue import Queue
+from collections import deque
 
 
-class ErrorHandler(Queue):
+class ErrorHandler:
     """Convenience error handler for :class:`B42Handler` and :class:`CommandHandler`.
 
     Intended for use as `rx_error_q` argument of the :class:`B42Handler` and
     :class:`CommandHandler` constructors.
     A provided callback is invoked for each queued :class:`B42Error`/:class:`CommandError`.
     The callback can be triggered synchronously or asynchronously.
+
+    Errors are buffered in a :class:`deque`, whose append/popleft are atomic under
+    the GIL - with the single producer (the :class:`B42Handler` receiver thread)
+    and single consumer (the :method:`process_errors()` caller) no lock is needed.
     """
 
-    def __init__(self, callback, async_process=False, **kwargs):
+    def __init__(self, callback, async_process=False):
         """Initialize the error handler.
 
         :param callback: callable to call for queued errors
@@ -44,15 +48,18 @@ class ErrorHandler(Queue):
             queued (probably in the :class:`B42Handler` receiver thread context),
             else collect all errors and synchronously call the `callback` for each
             of them on a call to :method:`process_errors()`
-        :param kwargs: passed to the :class:`Queue` parent constructor
         :raises: :class:`TypeError` if `callback` is not a callable
         """
 
         if not callable(callback):
             raise TypeError('callback is not a callable')
-        super().__init__(**kwargs)
+        self._q = deque()
         self._callback = callback
         self._async_process = bool(async_process)
+        # put() is the internal error entry point used by B42Handler and
+        # CommandHandler, its implementation is resolved once here: straight to
+        # the callback in async mode, straight to the C-level deque append else
+        self.put = self._callback if self._async_process else self._q.append
 
     def process_errors(self):
         """Synchronously trigger the callback.
@@ -62,12 +69,5 @@ class ErrorHandler(Queue):
         Has no effect when initialized for asynchronous processing.
         """
 
-        while not self.empty():
-            self._callback(self.get())
-
-    def put(self, item, *_, **__):
-        """Internal. Used by :class:`B42Handler` and :class:`CommandHandler`."""
-        if self._async_process:
-            self._callback(item)
-        else:
-            super().put(item)
+        while self._q:
+            self._callback(self._q.popleft())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# B42 protocol library
+#
+# Copyright (C) 2020 Archimedes Exhibitions GmbH
+# All rights reserved.
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons
+# to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED *AS IS*, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE
+# FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+from queue import Empty
+
+
+class B42FrameRing:
+    """Lock-free single-producer/single-consumer ring buffer for B42 frames.
+
+    Intended for use as `rx_frame_q` argument of the :class:`B42Handler`
+    constructor in high-frame-rate setups. The slots are preallocated once;
+    `put()` must only be called from a single thread (the :class:`B42Handler`
+    receiver thread) and `get()` from a single other thread. Under this
+    contract the head/tail index updates are atomic under the GIL and neither
+    side takes a lock.
+    """
+
+    DEFAULT_CAPACITY = 1024
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """Initialize the ring buffer.
+
+        :param capacity: number of frame slots to preallocate, rounded up to
+            the next power of two
+        :raises: :class:`ValueError` for a capacity less than 1
+        """
+
+        if capacity < 1:
+            raise ValueError('invalid capacity <%s>' % str(capacity))
+        size = 1
+        while size < capacity:
+            size *= 2
+        self._buffer = [None] * size
+        self._mask = size - 1
+        self._head = 0  # write index, only advanced by the producer
+        self._tail = 0  # read index, only advanced by the consumer
+        self._dropped = 0  # frames dropped on overflow, only advanced by the producer
+
+    @property
+    def capacity(self):
+        """The number of preallocated frame slots."""
+        return len(self._buffer)
+
+    @property
+    def dropped(self):
+        """The number of frames dropped due to overflow."""
+        return self._dropped
+
+    def qsize(self):
+        """Return the number of buffered frames."""
+        return self._head - self._tail
+
+    def empty(self):
+        """Return `True` if no frame is buffered."""
+        return self._head == self._tail
+
+    def full(self):
+        """Return `True` if all slots are occupied."""
+        return self._head - self._tail == len(self._buffer)
+
+    def put(self, frame):
+        """Append a frame (producer side only).
+
+        If all slots are occupied the frame is dropped and counted in
+        :attr:`dropped` - overflow must not raise into the producing
+        :class:`B42Handler` receiver thread.
+
+        :param frame: the frame to buffer
+        :returns: `True` if the frame was buffered, `False` if it was dropped
+        """
+
+        head = self._head
+        if head - self._tail == len(self._buffer):
+            self._dropped += 1
+            return False
+        self._buffer[head & self._mask] = frame
+        self._head = head + 1
+        return True
+
+    def get(self):
+        """Pop the oldest buffered frame (consumer side only).
+
+        :returns: the oldest buffered frame
+        :raises: :class:`queue.Empty` if no frame is buffered
+        """
+
+        tail = self._tail
+        if tail == self._head:
+            raise Empty
+        index = tail & self._mask
+        frame = self._buffer[index]
+        self._buffer[index] = None  # release the frame reference
+        self._tail = tail + 1
+        return frame
@@ -60,7 +60,7 @@ setup(
     url='https://github.com/amdx/',
     packages=PACKAGES,
     scripts=SCRIPTS,
-    python_requires='>=3.5',
+    python_requires='>=3.10',
     install_requires=['pyserial>=3.4'],
     test_suite='tests'
 )
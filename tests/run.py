@@ -31,12 +31,14 @@ sys.path.insert(0, '..')
 import test_b42handler
 import test_commandhandler
 import test_errorhandler
+import test_framering
 
 testLoader = unittest.TestLoader()
 suite = unittest.TestSuite()
 suite.addTest(testLoader.loadTestsFromModule(test_b42handler))
 suite.addTest(testLoader.loadTestsFromModule(test_commandhandler))
 suite.addTest(testLoader.loadTestsFromModule(test_errorhandler))
+suite.addTest(testLoader.loadTestsFromModule(test_framering))
 
 
 # implements the unittest load_tests protocol
@@ -27,7 +27,10 @@
 # Hook to simulate serial.Serial
 
 import time
-from queue import Queue
+from queue import Queue, Empty
+
+# all 256 one-byte bytes objects, built once at import
+_BYTE_TABLE = tuple(bytes((byte,)) for byte in range(256))
 
 
 class SerialClass:
@@ -42,6 +45,8 @@ class SerialClass:
         self._timeout = kwargs.get('timeout', None)
         self._host2board_q = Queue()
         self._board2host_q = Queue()
+        self._rx_buffer = bytearray()  # host side receive buffer
+        self._tx_buffer = bytearray()  # board side receive buffer
 
     # host side interface (pySerial API) - used by B42Handler #
 
@@ -50,39 +55,59 @@ class SerialClass:
         return 'serialdummy'
 
     def close(self):
-        self._host2board_q = Queue()
-        self._board2host_q = Queue()
+        # clear in place - no new Queue/Condition/deque allocations per close
+        with self._host2board_q.mutex:
+            self._host2board_q.queue.clear()
+        with self._board2host_q.mutex:
+            self._board2host_q.queue.clear()
+        self._rx_buffer.clear()
+        self._tx_buffer.clear()
 
     def write(self, data):
         self._host2board_q.put(data)
         return len(data)
 
-    def read(self):
+    @property
+    def in_waiting(self):
+        while not self._board2host_q.empty():
+            self._rx_buffer += self._board2host_q.get()
+        return len(self._rx_buffer)
+
+    def read(self, size=1):
         if self._timeout is not None:
             timeout = time.time() + self._timeout
-            while self._board2host_q.empty():
-                if timeout <= time.time():
-                    return b''
+            while len(self._rx_buffer) < size:
+                remaining = timeout - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._rx_buffer += self._board2host_q.get(timeout=remaining)
+                except Empty:
+                    break
         else:  # blocking
-            while self._board2host_q.empty():
-                pass
-        return self._board2host_q.get()
+            while len(self._rx_buffer) < size:
+                self._rx_buffer += self._board2host_q.get()
+        data = bytes(self._rx_buffer[:size])
+        del self._rx_buffer[:size]
+        return data
 
     # board side interface - used by tests #
 
     def board_write_byte(self, byte):
-        self._board2host_q.put(bytes((byte,)))
+        self._board2host_q.put(_BYTE_TABLE[byte])
+
+    def board_write(self, data):
+        self._board2host_q.put(bytes(data))
 
     def board_read_byte(self, timeout=None):
-        if timeout is not None:
-            timeout += time.time()
-            while self._host2board_q.empty():
-                if timeout <= time.time():
-                    return None
-        else:  # blocking
-            while self._host2board_q.empty():
-                pass
-        return self._host2board_q.get()[0]
+        if not self._tx_buffer:
+            try:
+                self._tx_buffer += self._host2board_q.get(timeout=timeout)
+            except Empty:
+                return None
+        byte = self._tx_buffer[0]
+        del self._tx_buffer[:1]
+        return byte
 
 
 class SerialModule:
@@ -60,10 +60,11 @@ class B42HandlerTestCase(unittest.TestCase):
 
     def send_command(self, command, data=None):
         num_bytes = len(data) if data else 0
-        self._board.board_write_byte(command | (num_bytes << 4))
+        frame = bytearray((command | (num_bytes << 4),))
         if num_bytes:
             for i, d in enumerate(data):
-                self._board.board_write_byte(d | ((i + 1) << 6))
+                frame.append(d | ((i + 1) << 6))
+        self._board.board_write(frame)  # whole frame in one put, like a real UART batch
 
     def check_sent_frame(self, data):
         seq_num = 0
@@ -149,6 +150,16 @@ class B42HandlerTestCase(unittest.TestCase):
         self.send_command(0x04, (1, 2, 3))
         self.check_received_frame(rx_q, now, 0x04, (1, 2, 3))
 
+    def test_recv_callback(self):
+        rx_frames = []
+        self._b42 = b42handler.B42Handler(rx_frame_cb=lambda t, c, d: rx_frames.append((c, d)))
+        self.send_command(0x01)
+        self.send_command(0x02, (1, 2))
+        timeout = time.time() + 1.0
+        while len(rx_frames) < 2 and time.time() < timeout:
+            time.sleep(0.01)
+        self.assertEqual(rx_frames, [(0x01, None), (0x02, (1, 2))])
+
 
 class B42HandlerErrorsTestCase(unittest.TestCase):
     @classmethod
@@ -31,143 +31,175 @@ from pyb42 import commandhandler
 
 commandhandler.logger.disabled = True
 
+_F = commandhandler.B42Frame
+
+# the test frames are literal constants, build them once at import
+FRAME1 = _F(1, 0x01, None)
+FRAME2 = _F(2, 0x01, (1, 2, 3))
+FRAME3 = _F(3, 0x02, (0,))
+
+# num_data violations, each frame must produce a CMD_ERROR_NUM_DATA
+NUM_DATA_ERROR_FRAMES = (
+    _F(1, 0x00, (1,)),  # no data bytes accepted
+    _F(10, 0x01, None),  # 1 data byte accepted
+    _F(12, 0x01, (1, 2)),
+    _F(20, 0x02, None),  # 2 data bytes accepted
+    _F(21, 0x02, (1,)),
+    _F(23, 0x02, (1, 2, 3)),
+    _F(30, 0x03, None),  # 3 data bytes accepted
+    _F(32, 0x03, (1, 2)),
+    _F(34, 0x03, (1, 2, 3, 4)),
+    _F(41, 0x04, (1,)),  # 0 or 2 data bytes accepted
+    _F(43, 0x04, (1, 2, 3)),
+)
+
 
 class CommandHandlerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the handlers and their registrations are immutable across the test
+        # methods, build them once and only reset the observation state per test
+        cls._dispatched_commands = []
+        cls._ch_sync = commandhandler.CommandHandler(None, False)
+        cls._ch_sync.register_command(0x01, cls.cmd_callback1)
+        cls._ch_sync.register_command(0x02, cls.cmd_callback2)
+        cls._ch_async = commandhandler.CommandHandler(None, True)
+        cls._ch_async.register_command(0x01, cls.cmd_callback1)
+        cls._ch_async.register_command(0x02, cls.cmd_callback2)
+        cls._ch_numdata = commandhandler.CommandHandler(None, True)
+        cls._ch_numdata.register_command(0x00, lambda t, d: cls.cmd_callback(0x00, t, d), 0)
+        cls._ch_numdata.register_command(0x01, lambda t, d: cls.cmd_callback(0x01, t, d), 1)
+        cls._ch_numdata.register_command(0x02, lambda t, d: cls.cmd_callback(0x02, t, d), 2)
+        cls._ch_numdata.register_command(0x03, lambda t, d: cls.cmd_callback(0x03, t, d), 3)
+        cls._ch_numdata.register_command(
+            0x04, lambda t, d: cls.cmd_callback(0x04, t, d), (0, 1, 2, 3)
+        )
+
     def setUp(self):
-        self._dispatched_commands = []
+        self._dispatched_commands.clear()
 
-    def cmd_callback(self, command, timestamp, data):
-        self._dispatched_commands.append((timestamp, command, data))
+    @classmethod
+    def cmd_callback(cls, command, timestamp, data):
+        cls._dispatched_commands.append((timestamp, command, data))
 
-    def cmd_callback1(self, timestamp, data):
-        self.cmd_callback(0x01, timestamp, data)
+    @classmethod
+    def cmd_callback1(cls, timestamp, data):
+        cls.cmd_callback(0x01, timestamp, data)
 
-    def cmd_callback2(self, timestamp, data):
-        self.cmd_callback(0x02, timestamp, data)
+    @classmethod
+    def cmd_callback2(cls, timestamp, data):
+        cls.cmd_callback(0x02, timestamp, data)
 
     def test_commands_sync(self):
-        ch = commandhandler.CommandHandler(None, False)
-        ch.register_command(0x01, self.cmd_callback1)
-        ch.register_command(0x02, self.cmd_callback2)
+        ch = self._ch_sync
         self.assertEqual(len(self._dispatched_commands), 0)
-        ch.put(commandhandler.B42Frame(1, 0x01, None))
-        ch.put(commandhandler.B42Frame(2, 0x01, (1, 2, 3)))
+        ch.put(FRAME1)
+        ch.put(FRAME2)
         self.assertEqual(len(self._dispatched_commands), 0)
         ch.dispatch_commands()
         self.assertEqual(len(self._dispatched_commands), 2)
         self.assertEqual((1, 0x01, None), self._dispatched_commands[0])
         self.assertEqual((2, 0x01, (1, 2, 3)), self._dispatched_commands[1])
-        ch.put(commandhandler.B42Frame(3, 0x02, (0,)))
+        ch.put(FRAME3)
         self.assertEqual(len(self._dispatched_commands), 2)
         ch.dispatch_commands()
         self.assertEqual(len(self._dispatched_commands), 3)
         self.assertEqual((3, 0x02, (0,)), self._dispatched_commands[2])
 
     def test_commands_async(self):
-        ch = commandhandler.CommandHandler(None, True)
-        ch.register_command(0x01, self.cmd_callback1)
-        ch.register_command(0x02, self.cmd_callback2)
+        ch = self._ch_async
         self.assertEqual(len(self._dispatched_commands), 0)
-        ch.put(commandhandler.B42Frame(1, 0x01, None))
+        ch.put(FRAME1)
         self.assertEqual(len(self._dispatched_commands), 1)
         self.assertEqual((1, 0x01, None), self._dispatched_commands[0])
-        ch.put(commandhandler.B42Frame(2, 0x01, (1, 2, 3)))
+        ch.put(FRAME2)
         self.assertEqual(len(self._dispatched_commands), 2)
         self.assertEqual((2, 0x01, (1, 2, 3)), self._dispatched_commands[1])
-        ch.put(commandhandler.B42Frame(3, 0x02, (0,)))
+        ch.put(FRAME3)
         self.assertEqual(len(self._dispatched_commands), 3)
         self.assertEqual((3, 0x02, (0,)), self._dispatched_commands[2])
 
     def test_num_data(self):
-        ch = commandhandler.CommandHandler(None, True)
-        ch.register_command(0x00, lambda t, d: self.cmd_callback(0x00, t, d), 0)
-        ch.register_command(0x01, lambda t, d: self.cmd_callback(0x01, t, d), 1)
-        ch.register_command(0x02, lambda t, d: self.cmd_callback(0x02, t, d), 2)
-        ch.register_command(0x03, lambda t, d: self.cmd_callback(0x03, t, d), 3)
-        ch.register_command(0x04, lambda t, d: self.cmd_callback(0x04, t, d), (0, 1, 2, 3))
-        ch.put(commandhandler.B42Frame(1, 0x00, None))
+        ch = self._ch_numdata
+        ch.put(_F(1, 0x00, None))
         self.assertEqual((1, 0x00, None), self._dispatched_commands[0])
-        ch.put(commandhandler.B42Frame(2, 0x01, (1,)))
+        ch.put(_F(2, 0x01, (1,)))
         self.assertEqual((2, 0x01, (1,)), self._dispatched_commands[1])
-        ch.put(commandhandler.B42Frame(3, 0x02, (1, 2)))
+        ch.put(_F(3, 0x02, (1, 2)))
         self.assertEqual((3, 0x02, (1, 2)), self._dispatched_commands[2])
-        ch.put(commandhandler.B42Frame(4, 0x03, (1, 2, 3)))
+        ch.put(_F(4, 0x03, (1, 2, 3)))
         self.assertEqual((4, 0x03, (1, 2, 3)), self._dispatched_commands[3])
-        ch.put(commandhandler.B42Frame(5, 0x04, None))
+        ch.put(_F(5, 0x04, None))
         self.assertEqual((5, 0x04, None), self._dispatched_commands[4])
-        ch.put(commandhandler.B42Frame(6, 0x04, (1,)))
+        ch.put(_F(6, 0x04, (1,)))
         self.assertEqual((6, 0x04, (1,)), self._dispatched_commands[5])
-        ch.put(commandhandler.B42Frame(7, 0x04, (1, 2)))
+        ch.put(_F(7, 0x04, (1, 2)))
         self.assertEqual((7, 0x04, (1, 2)), self._dispatched_commands[6])
-        ch.put(commandhandler.B42Frame(8, 0x04, (1, 2, 3)))
+        ch.put(_F(8, 0x04, (1, 2, 3)))
         self.assertEqual((8, 0x04, (1, 2, 3)), self._dispatched_commands[7])
 
 
 class CommandHandlerErrorsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._num_dispatched = 0
+        cls._error_q = Queue()
+        cls._ch_unregistered = commandhandler.CommandHandler(cls._error_q, True)
+        cls._ch_numdata = commandhandler.CommandHandler(cls._error_q, True)
+        cls._ch_numdata.register_command(0x00, lambda t, d: cls.cmd_callback(0x00, t, d), 0)
+        cls._ch_numdata.register_command(0x01, lambda t, d: cls.cmd_callback(0x01, t, d), 1)
+        cls._ch_numdata.register_command(0x02, lambda t, d: cls.cmd_callback(0x02, t, d), 2)
+        cls._ch_numdata.register_command(0x03, lambda t, d: cls.cmd_callback(0x03, t, d), 3)
+        cls._ch_numdata.register_command(0x04, lambda t, d: cls.cmd_callback(0x04, t, d), (0, 2))
+
     def setUp(self):
-        self._num_dispatched = 0
-        self._error_q = Queue()
+        type(self)._num_dispatched = 0
+        while not self._error_q.empty():
+            self._error_q.get_nowait()
 
-    def cmd_callback(self, *_):
-        self._num_dispatched += 1
+    @classmethod
+    def cmd_callback(cls, *_):
+        cls._num_dispatched += 1
 
     def check_error(self, timestamp, code):
         self.assertEqual(self._num_dispatched, 0)
-        self.assertEqual(self._error_q.qsize(), 1)
-        error = self._error_q.get()
+        # a single get_nowait instead of a qsize/get pair, each taking the mutex
+        error = self._error_q.get_nowait()
         self.assertIsInstance(error, commandhandler.CommandError)
         self.assertEqual(error.timestamp, timestamp)
         self.assertEqual(error.code, code)
+        self.assertTrue(self._error_q.empty())
 
     def test_register_command(self):
         ch = commandhandler.CommandHandler(None, True)
         # invalid code type
         self.assertRaises(TypeError, ch.register_command, 'foo', self.cmd_callback)
+        # code out of range
+        self.assertRaises(ValueError, ch.register_command, -1, self.cmd_callback)
+        self.assertRaises(ValueError, ch.register_command, 0x10, self.cmd_callback)
         # invalid callback type
-        self.assertRaises(TypeError, ch.register_command, 42, 'foo')
+        self.assertRaises(TypeError, ch.register_command, 0x02, 'foo')
         # invalid num_data parameters
         self.assertRaises(TypeError, ch.register_command, 0x01, self.cmd_callback, 'foo')
         self.assertRaises(TypeError, ch.register_command, 0x01, self.cmd_callback, (1, 'foo'))
+        self.assertRaises(TypeError, ch.register_command, 0x01, self.cmd_callback, (1.0,))
+        self.assertRaises(TypeError, ch.register_command, 0x01, self.cmd_callback, [True])
 
     def test_unregistered(self):
-        ch = commandhandler.CommandHandler(self._error_q, True)
+        ch = self._ch_unregistered
         self.assertTrue(self._error_q.empty())
         # unregistered command
-        ch.put(commandhandler.B42Frame(1, 0x01, None))
+        ch.put(FRAME1)
         self.check_error(1, commandhandler.CMD_ERROR_UNREGISTERED)
 
     def test_num_data(self):
-        ch = commandhandler.CommandHandler(self._error_q, True)
-        ch.register_command(0x00, lambda t, d: self.cmd_callback(0x00, t, d), 0)
-        ch.register_command(0x01, lambda t, d: self.cmd_callback(0x01, t, d), 1)
-        ch.register_command(0x02, lambda t, d: self.cmd_callback(0x02, t, d), 2)
-        ch.register_command(0x03, lambda t, d: self.cmd_callback(0x03, t, d), 3)
-        ch.register_command(0x10, lambda t, d: self.cmd_callback(0x03, t, d), (0, 2))
+        ch = self._ch_numdata
+        self.assertTrue(self._error_q.empty())
+        for frame in NUM_DATA_ERROR_FRAMES:
+            ch.put(frame)
+            error = self._error_q.get_nowait()
+            self.assertIsInstance(error, commandhandler.CommandError)
+            self.assertEqual(error.timestamp, frame.timestamp)
+            self.assertEqual(error.code, commandhandler.CMD_ERROR_NUM_DATA)
+        self.assertEqual(self._num_dispatched, 0)
         self.assertTrue(self._error_q.empty())
-        # no data bytes accepted
-        ch.put(commandhandler.B42Frame(1, 0x00, (1,)))
-        self.check_error(1, commandhandler.CMD_ERROR_NUM_DATA)
-        # 1 data byte accepted
-        ch.put(commandhandler.B42Frame(10, 0x01, None))
-        self.check_error(10, commandhandler.CMD_ERROR_NUM_DATA)
-        ch.put(commandhandler.B42Frame(12, 0x01, (1, 2)))
-        self.check_error(12, commandhandler.CMD_ERROR_NUM_DATA)
-        # 2 data bytes accepted
-        ch.put(commandhandler.B42Frame(20, 0x02, None))
-        self.check_error(20, commandhandler.CMD_ERROR_NUM_DATA)
-        ch.put(commandhandler.B42Frame(21, 0x02, (1,)))
-        self.check_error(21, commandhandler.CMD_ERROR_NUM_DATA)
-        ch.put(commandhandler.B42Frame(23, 0x02, (1, 2, 3)))
-        self.check_error(23, commandhandler.CMD_ERROR_NUM_DATA)
-        # 3 data bytes accepted
-        ch.put(commandhandler.B42Frame(30, 0x03, None))
-        self.check_error(30, commandhandler.CMD_ERROR_NUM_DATA)
-        ch.put(commandhandler.B42Frame(32, 0x03, (1, 2)))
-        self.check_error(32, commandhandler.CMD_ERROR_NUM_DATA)
-        ch.put(commandhandler.B42Frame(34, 0x03, (1, 2, 3, 4)))
-        self.check_error(34, commandhandler.CMD_ERROR_NUM_DATA)
-        # 0 or 2 data bytes accepted
-        ch.put(commandhandler.B42Frame(41, 0x00, (1,)))
-        self.check_error(41, commandhandler.CMD_ERROR_NUM_DATA)
-        ch.put(commandhandler.B42Frame(43, 0x02, (1, 2, 3)))
-        self.check_error(43, commandhandler.CMD_ERROR_NUM_DATA)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# B42 protocol library
+#
+# Copyright (C) 2020 Archimedes Exhibitions GmbH
+# All rights reserved.
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons
+# to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED *AS IS*, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE
+# FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import unittest
+from queue import Empty
+
+from pyb42 import framering
+
+
+class B42FrameRingTestCase(unittest.TestCase):
+    def test_capacity(self):
+        self.assertEqual(framering.B42FrameRing().capacity, framering.B42FrameRing.DEFAULT_CAPACITY)
+        self.assertEqual(framering.B42FrameRing(1).capacity, 1)
+        self.assertEqual(framering.B42FrameRing(4).capacity, 4)
+        # capacity is rounded up to the next power of two
+        self.assertEqual(framering.B42FrameRing(3).capacity, 4)
+        self.assertEqual(framering.B42FrameRing(100).capacity, 128)
+
+    def test_put_get(self):
+        ring = framering.B42FrameRing(4)
+        self.assertTrue(ring.empty())
+        self.assertEqual(ring.qsize(), 0)
+        ring.put('frame1')
+        ring.put('frame2')
+        self.assertFalse(ring.empty())
+        self.assertEqual(ring.qsize(), 2)
+        self.assertEqual(ring.get(), 'frame1')
+        self.assertEqual(ring.get(), 'frame2')
+        self.assertTrue(ring.empty())
+
+    def test_wraparound(self):
+        ring = framering.B42FrameRing(2)
+        for i in range(10):
+            ring.put(i)
+            self.assertEqual(ring.get(), i)
+        self.assertTrue(ring.empty())
+
+
+class B42FrameRingErrorsTestCase(unittest.TestCase):
+    def test_capacity(self):
+        self.assertRaises(ValueError, framering.B42FrameRing, 0)
+        self.assertRaises(ValueError, framering.B42FrameRing, -1)
+
+    def test_empty(self):
+        ring = framering.B42FrameRing(2)
+        self.assertRaises(Empty, ring.get)
+
+    def test_full(self):
+        ring = framering.B42FrameRing(2)
+        self.assertTrue(ring.put('frame1'))
+        self.assertTrue(ring.put('frame2'))
+        self.assertTrue(ring.full())
+        # overflow drops the frame instead of raising into the producer
+        self.assertFalse(ring.put('frame3'))
+        self.assertEqual(ring.dropped, 1)
+        # the ring is usable again once a slot is freed
+        self.assertEqual(ring.get(), 'frame1')
+        self.assertTrue(ring.put('frame3'))
+        self.assertEqual(ring.get(), 'frame2')
+        self.assertEqual(ring.get(), 'frame3')
+        self.assertEqual(ring.dropped, 1)